@@ -2,23 +2,22 @@ import streamlit as st
 import folium
 from folium import plugins
 from streamlit_folium import st_folium
+import streamlit.components.v1 as components
 import pandas as pd
 import numpy as np
 from datetime import datetime
-import requests
-import json
-from shapely.geometry import Point, LineString
-import matplotlib.pyplot as plt
-import matplotlib
-matplotlib.use('Agg')
-from io import BytesIO
-from PIL import Image
-import base64
 import os
-from fpdf import FPDF
-import tempfile
+from fpdf import FPDF, XPos, YPos
 import math
 
+# Shared chart fonts - applied once per process by load_figure_class
+CHART_RC_PARAMS = {
+    'axes.labelsize': 10,
+    'axes.labelweight': 'bold',
+    'axes.titlesize': 11,
+    'axes.titleweight': 'bold'
+}
+
 # Page configuration
 st.set_page_config(
     page_title="Deccan Environmental Analysis",
@@ -72,19 +71,102 @@ if 'analysis_results' not in st.session_state:
     st.session_state.analysis_results = {}
 if 'drawn_lines' not in st.session_state:
     st.session_state.drawn_lines = []
+if 'pdf_reports' not in st.session_state:
+    st.session_state.pdf_reports = {}
+
+# Risk level thresholds (LOW < 40 <= MODERATE < 60 <= HIGH < 75 <= CRITICAL)
+RISK_THRESHOLDS = np.array([40, 60, 75])
+RISK_COLORS = np.array(['#10b981', '#f59e0b', '#ea580c', '#dc2626'])
+RISK_LEVELS = ('LOW', 'MODERATE', 'HIGH', 'CRITICAL')
+PDF_STATUS_COLORS = ((46, 204, 113), (241, 196, 15), (230, 126, 34), (192, 57, 43))
+RISK_CARD_STYLES = ('risk-low', 'risk-moderate', 'risk-high', 'risk-critical')
+RISK_EMOJIS = ('🟢', '🟡', '🟠', '🔴')
+
+def risk_level_index(scores):
+    """Bucket risk scores into level indices (0=LOW, 1=MODERATE, 2=HIGH, 3=CRITICAL)"""
+    return np.searchsorted(RISK_THRESHOLDS, scores, side='right')
+
+# (label, dataframe column, analysis risk key) rows of the PDF metrics table
+PDF_METRIC_SPECS = (
+    ('Temperature (C)', 'temp_max', 'temp_risk'),
+    ('Rainfall (mm)', 'rainfall_max', 'rainfall_risk'),
+    ('Humidity (%)', 'humidity_max', 'humidity_risk'),
+    ('Wind Speed (km/h)', 'wind_max', 'wind_risk'),
+    ('Solar (kWh/m2/day)', 'solar_max', 'solar_risk'),
+    ('Salinity (ppm)', 'salinity_max', 'salinity_risk'),
+    ('Seismic Zone', 'seismic_zone', 'seismic_risk')
+)
+
+LOGO_PATH = "deccan_logo.png"
+
+# (analysis risk key, ((threshold, priority, recommendation), ...)) - the first
+# tier whose threshold the risk score exceeds is reported
+PDF_RECOMMENDATION_RULES = (
+    ('temp_risk', (
+        (75, 'CRITICAL', 'Deploy high-temperature rated insulators (>50C tolerance). Maximum temperature exceeds 45C in multiple zones.'),
+        (60, 'HIGH', 'Use enhanced thermal-resistant insulators for sustained high temperatures (40-45C range).')
+    )),
+    ('rainfall_risk', (
+        (75, 'CRITICAL', 'Install hydrophobic silicone insulators with superior water-shedding properties. Heavy rainfall exceeds 350mm.'),
+        (60, 'HIGH', 'Use polymer composite insulators designed for high-moisture environments.')
+    )),
+    ('humidity_risk', (
+        (75, 'CRITICAL', 'Apply specialized anti-tracking coatings. Humidity regularly exceeds 90%.'),
+        (60, 'HIGH', 'Use hydrophobic insulators to prevent surface moisture accumulation.')
+    )),
+    ('wind_risk', (
+        (75, 'CRITICAL', 'Reinforce tower structures for extreme wind loads (>80 km/h). Use aerodynamic insulator designs.'),
+        (60, 'HIGH', 'Implement enhanced structural support for sustained high winds (60-80 km/h).')
+    )),
+    ('solar_risk', (
+        (70, 'HIGH', 'Deploy UV-resistant materials with enhanced weathering protection (>6.5 kWh/m2/day solar exposure).'),
+    )),
+    ('salinity_risk', (
+        (75, 'CRITICAL', 'Install anti-salt fog insulators with specialized surface treatments. Coastal salinity exceeds 33,000 ppm.'),
+        (60, 'HIGH', 'Use corrosion-resistant materials for moderate coastal salinity (25,000-33,000 ppm).')
+    )),
+    ('seismic_risk', (
+        (70, 'HIGH', 'Implement seismic-resistant tower designs per Zone 4/5 specifications (BIS standards).'),
+    ))
+)
+
+PDF_GENERAL_RECOMMENDATIONS = '\n'.join(f'-  {rec}' for rec in (
+    'Implement real-time environmental monitoring system along the entire corridor',
+    'Conduct quarterly inspections with focus on high-risk segments identified in this report',
+    'Maintain detailed maintenance logs for all critical zones (severity >60)',
+    'Review and update risk assessment annually with latest IMD data',
+    'Establish emergency response protocols for extreme weather events',
+    'Train maintenance personnel on environmental risk factors specific to this corridor'
+))
+
+# Static text of the PDF data sources page - identical for every report
+PDF_PRIMARY_SOURCE = 'IMD - India Meteorological Department (mausam.imd.gov.in)\nOfficial national meteorological service providing comprehensive environmental data across India.'
+PDF_DATA_SPECS = (
+    ('Time Period:', '2015-2024 (10 years)'),
+    ('Spatial Resolution:', '0.25 degrees x 0.25 degrees (~25-30 km grid)'),
+    ('Data Type:', 'Historical Maximum Values'),
+    ('Parameters:', 'Temperature, Rainfall, Humidity, Wind Speed, Solar Radiation'),
+    ('Additional Sources:', 'Coastal salinity from marine monitoring; Seismic zones from BIS')
+)
+PDF_METHODOLOGY = (
+    'This assessment uses maximum observed values over the 10-year period rather than averages. This approach ensures that equipment specifications and maintenance protocols account for worst-case scenarios that occur periodically along the transmission corridor.'
+    '\n\n'
+    'Risk scoring: Each environmental parameter is evaluated on a 0-100 scale based on impact to transmission line insulators. Scores are derived from industry standards, manufacturer specifications, and empirical failure data.'
+)
+PDF_DISCLAIMER = 'This report is generated based on historical environmental data and predictive risk models. Actual conditions may vary. Final equipment specifications and installation designs should be validated through detailed site surveys, engineering analysis, and consultation with equipment manufacturers. Deccan Enterprises Pvt. Ltd. provides this assessment as a planning tool and does not guarantee specific outcomes.'
 
 # PDF Generation Class
 class DeccanPDF(FPDF):
     def __init__(self):
         super().__init__()
         self.set_auto_page_break(auto=True, margin=15)
+        self.has_logo = os.path.exists(LOGO_PATH)
     
     def header(self):
         # Add logo if available
-        logo_path = "deccan_logo.png"
-        if os.path.exists(logo_path):
+        if self.has_logo:
             try:
-                self.image(logo_path, x=10, y=8, w=50)
+                self.image(LOGO_PATH, x=10, y=8, w=50)
             except:
                 pass
         
@@ -96,55 +178,83 @@ class DeccanPDF(FPDF):
     
     def footer(self):
         self.set_y(-15)
-        self.set_font('Arial', 'I', 8)
+        self.set_font('helvetica', 'I', 8)
         self.set_text_color(128, 128, 128)
-        self.cell(0, 10, f'Page {self.page_no()}', 0, 0, 'C')
+        self.cell(0, 10, f'Page {self.page_no()}', align='C')
     
     def chapter_title(self, title):
-        self.set_font('Arial', 'B', 16)
+        self.set_font('helvetica', 'B', 16)
         self.set_fill_color(0, 51, 102)
         self.set_text_color(255, 255, 255)
-        self.cell(0, 10, title, 0, 1, 'L', 1)
+        self.cell(0, 10, title, new_x=XPos.LMARGIN, new_y=YPos.NEXT, align='L', fill=True)
         self.ln(4)
     
     def section_title(self, title):
-        self.set_font('Arial', 'B', 12)
+        self.set_font('helvetica', 'B', 12)
         self.set_text_color(0, 51, 102)
-        self.cell(0, 8, title, 0, 1)
+        self.cell(0, 8, title, new_x=XPos.LMARGIN, new_y=YPos.NEXT)
         self.set_text_color(0, 0, 0)
         self.ln(2)
+    
+    def data_sources_page(self):
+        """Add the static data sources & methodology page"""
+        self.add_page()
+        # The page is known to fit on one sheet, so skip the per-line
+        # page-break checks while it is laid out
+        self.set_auto_page_break(auto=False)
+        self.chapter_title('DATA SOURCES & METHODOLOGY')
+        
+        self.section_title('Primary Data Source')
+        self.set_font('helvetica', '', 10)
+        self.multi_cell(0, 5, PDF_PRIMARY_SOURCE, new_x=XPos.LMARGIN, new_y=YPos.NEXT)
+        self.ln(3)
+        
+        self.section_title('Data Specifications')
+        for label, value in PDF_DATA_SPECS:
+            self.set_font('helvetica', 'B', 9)
+            self.cell(50, 5, f'  {label}')
+            self.set_font('helvetica', '', 9)
+            self.cell(0, 5, value, new_x=XPos.LMARGIN, new_y=YPos.NEXT)
+        
+        self.ln(3)
+        self.section_title('Methodology')
+        self.set_font('helvetica', '', 9)
+        self.multi_cell(0, 5, PDF_METHODOLOGY, new_x=XPos.LMARGIN, new_y=YPos.NEXT)
+        
+        self.ln(5)
+        self.section_title('Disclaimer')
+        self.set_font('helvetica', 'I', 8)
+        self.set_text_color(100, 100, 100)
+        self.multi_cell(0, 4, PDF_DISCLAIMER, new_x=XPos.LMARGIN, new_y=YPos.NEXT)
+        self.set_auto_page_break(auto=True, margin=15)
 
-def generate_professional_pdf(line_name, analysis, client_name, project_code, circle_radius, sample_spacing):
-    """Generate professional PDF report"""
+def generate_professional_pdf(line_name, analysis, client_name, project_code, circle_radius, sample_spacing, report_date):
+    """Generate professional PDF report dated report_date, returned as (pdf_bytes, filename)"""
     
     pdf = DeccanPDF()
     df = analysis['dataframe']
-    line_data = analysis['line_data']
-    
-    # Calculate corridor length
-    coords = [[p['lat'], p['lon']] for p in line_data]
-    line = LineString([(lon, lat) for lat, lon in coords])
-    corridor_length = line.length * 111  # Approximate km
+    num_points = analysis['num_points']
+    corridor_length = analysis['corridor_length_km']
     
     # PAGE 1: COVER PAGE
     pdf.add_page()
     pdf.ln(30)
     
     # Title
-    pdf.set_font('Arial', 'B', 28)
+    pdf.set_font('helvetica', 'B', 28)
     pdf.set_text_color(0, 51, 102)
-    pdf.cell(0, 15, 'TRANSMISSION LINE', 0, 1, 'C')
-    pdf.set_font('Arial', 'B', 22)
-    pdf.cell(0, 12, 'Environmental Risk Assessment', 0, 1, 'C')
+    pdf.cell(0, 15, 'TRANSMISSION LINE', new_x=XPos.LMARGIN, new_y=YPos.NEXT, align='C')
+    pdf.set_font('helvetica', 'B', 22)
+    pdf.cell(0, 12, 'Environmental Risk Assessment', new_x=XPos.LMARGIN, new_y=YPos.NEXT, align='C')
     pdf.ln(15)
     
     # Project info box
     pdf.set_fill_color(240, 240, 240)
-    pdf.set_font('Arial', 'B', 11)
+    pdf.set_font('helvetica', 'B', 11)
     pdf.set_text_color(0, 51, 102)
-    pdf.cell(0, 8, 'PROJECT INFORMATION', 0, 1, 'L', 1)
+    pdf.cell(0, 8, 'PROJECT INFORMATION', new_x=XPos.LMARGIN, new_y=YPos.NEXT, align='L', fill=True)
     
-    pdf.set_font('Arial', '', 11)
+    pdf.set_font('helvetica', '', 11)
     pdf.set_text_color(0, 0, 0)
     pdf.ln(3)
     
@@ -152,8 +262,8 @@ def generate_professional_pdf(line_name, analysis, client_name, project_code, ci
         ('Client:', client_name),
         ('Project Code:', project_code),
         ('Line Description:', line_name),
-        ('Report Generated:', datetime.now().strftime('%d %B %Y, %H:%M IST')),
-        ('Analysis Points:', str(len(df))),
+        ('Report Generated:', report_date.strftime('%d %B %Y')),
+        ('Analysis Points:', str(num_points)),
         ('Corridor Length:', f'{corridor_length:.2f} km'),
         ('Data Source:', 'IMD (India Meteorological Department)'),
         ('Data Period:', '2015-2024 (10 Years - Maximum Values)'),
@@ -162,50 +272,40 @@ def generate_professional_pdf(line_name, analysis, client_name, project_code, ci
     ]
     
     for label, value in info_items:
-        pdf.set_font('Arial', 'B', 10)
-        pdf.cell(60, 6, label, 0, 0)
-        pdf.set_font('Arial', '', 10)
-        pdf.cell(0, 6, value, 0, 1)
+        pdf.set_font('helvetica', 'B', 10)
+        pdf.cell(60, 6, label)
+        pdf.set_font('helvetica', '', 10)
+        pdf.cell(0, 6, value, new_x=XPos.LMARGIN, new_y=YPos.NEXT)
     
     pdf.ln(10)
     
     # Overall risk status
     overall_risk = analysis['overall_risk']
-    if overall_risk >= 75:
-        fill_color = (192, 57, 43)
-        status = "CRITICAL"
-    elif overall_risk >= 60:
-        fill_color = (230, 126, 34)
-        status = "HIGH"
-    elif overall_risk >= 40:
-        fill_color = (241, 196, 15)
-        status = "MODERATE"
-    else:
-        fill_color = (46, 204, 113)
-        status = "LOW"
+    overall_level = risk_level_index(overall_risk)
+    status = RISK_LEVELS[overall_level]
     
-    pdf.set_fill_color(*fill_color)
+    pdf.set_fill_color(*PDF_STATUS_COLORS[overall_level])
     pdf.set_text_color(255, 255, 255)
-    pdf.set_font('Arial', 'B', 18)
-    pdf.cell(0, 12, f'OVERALL STATUS: {status}', 0, 1, 'C', 1)
+    pdf.set_font('helvetica', 'B', 18)
+    pdf.cell(0, 12, f'OVERALL STATUS: {status}', new_x=XPos.LMARGIN, new_y=YPos.NEXT, align='C', fill=True)
     pdf.set_text_color(0, 0, 0)
     pdf.ln(3)
     
-    pdf.set_font('Arial', '', 11)
-    pdf.cell(0, 6, f'Overall Severity Score: {overall_risk:.1f}/100', 0, 1, 'C')
+    pdf.set_font('helvetica', '', 11)
+    pdf.cell(0, 6, f'Overall Severity Score: {overall_risk:.1f}/100', new_x=XPos.LMARGIN, new_y=YPos.NEXT, align='C')
     pdf.ln(5)
     
-    pdf.set_font('Arial', 'I', 9)
+    pdf.set_font('helvetica', 'I', 9)
     pdf.set_text_color(100, 100, 100)
-    pdf.multi_cell(0, 5, 'This assessment is based on IMD historical maximum values observed over 10 years (2015-2024). All parameters represent extreme conditions that equipment must withstand.')
+    pdf.multi_cell(0, 5, 'This assessment is based on IMD historical maximum values observed over 10 years (2015-2024). All parameters represent extreme conditions that equipment must withstand.', new_x=XPos.LMARGIN, new_y=YPos.NEXT)
     
     # PAGE 2: EXECUTIVE SUMMARY
     pdf.add_page()
     pdf.chapter_title('EXECUTIVE SUMMARY')
     
-    pdf.set_font('Arial', '', 10)
-    summary_text = f"This comprehensive assessment evaluates environmental conditions along a {corridor_length:.2f} km transmission corridor across {len(df)} strategic sampling points. The analysis uses IMD (India Meteorological Department) historical data spanning 10 years (2015-2024), focusing on maximum observed values to ensure equipment specifications account for worst-case scenarios."
-    pdf.multi_cell(0, 5, summary_text)
+    pdf.set_font('helvetica', '', 10)
+    summary_text = f"This comprehensive assessment evaluates environmental conditions along a {corridor_length:.2f} km transmission corridor across {num_points} strategic sampling points. The analysis uses IMD (India Meteorological Department) historical data spanning 10 years (2015-2024), focusing on maximum observed values to ensure equipment specifications account for worst-case scenarios."
+    pdf.multi_cell(0, 5, summary_text, new_x=XPos.LMARGIN, new_y=YPos.NEXT)
     pdf.ln(5)
     
     # Risk distribution
@@ -215,17 +315,17 @@ def generate_professional_pdf(line_name, analysis, client_name, project_code, ci
                    analysis['wind_risk'], analysis['solar_risk'], analysis['salinity_risk'],
                    analysis['seismic_risk']]
     
-    critical = sum(1 for s in risk_scores if s >= 75)
-    high = sum(1 for s in risk_scores if 60 <= s < 75)
-    moderate = sum(1 for s in risk_scores if 40 <= s < 60)
-    low = sum(1 for s in risk_scores if s < 40)
-    total = len(risk_scores)
-    
-    pdf.set_font('Arial', '', 10)
-    pdf.cell(0, 6, f'- Critical Risk Zones (>75): {critical} parameters ({critical/total*100:.1f}%)', 0, 1)
-    pdf.cell(0, 6, f'- High Risk Zones (60-75): {high} parameters ({high/total*100:.1f}%)', 0, 1)
-    pdf.cell(0, 6, f'- Moderate Risk Zones (40-60): {moderate} parameters ({moderate/total*100:.1f}%)', 0, 1)
-    pdf.cell(0, 6, f'- Low Risk Zones (<40): {low} parameters ({low/total*100:.1f}%)', 0, 1)
+    level_counts = np.bincount(risk_level_index(risk_scores), minlength=4)
+    low, moderate, high, critical = level_counts
+    low_pct, moderate_pct, high_pct, critical_pct = level_counts / len(risk_scores) * 100
+    
+    pdf.set_font('helvetica', '', 10)
+    pdf.multi_cell(0, 6, '\n'.join([
+        f'- Critical Risk Zones (>75): {critical} parameters ({critical_pct:.1f}%)',
+        f'- High Risk Zones (60-75): {high} parameters ({high_pct:.1f}%)',
+        f'- Moderate Risk Zones (40-60): {moderate} parameters ({moderate_pct:.1f}%)',
+        f'- Low Risk Zones (<40): {low} parameters ({low_pct:.1f}%)'
+    ]), new_x=XPos.LMARGIN, new_y=YPos.NEXT)
     pdf.ln(5)
     
     # KEY ENVIRONMENTAL METRICS TABLE
@@ -234,37 +334,35 @@ def generate_professional_pdf(line_name, analysis, client_name, project_code, ci
     # Table header
     pdf.set_fill_color(0, 51, 102)
     pdf.set_text_color(255, 255, 255)
-    pdf.set_font('Arial', 'B', 9)
+    pdf.set_font('helvetica', 'B', 9)
     
     col_widths = [55, 30, 25, 25, 35]
     headers = ['Parameter', 'Average', 'Min', 'Max', 'Risk Score']
     
     for i, header in enumerate(headers):
-        pdf.cell(col_widths[i], 7, header, 1, 0, 'C', 1)
+        pdf.cell(col_widths[i], 7, header, border=1, align='C', fill=True)
     pdf.ln()
     
     # Table rows
     pdf.set_text_color(0, 0, 0)
-    pdf.set_font('Arial', '', 9)
-    
-    metrics_data = [
-        ('Temperature (C)', df['temp_max'].mean(), df['temp_max'].min(), df['temp_max'].max(), analysis['temp_risk']),
-        ('Rainfall (mm)', df['rainfall_max'].mean(), df['rainfall_max'].min(), df['rainfall_max'].max(), analysis['rainfall_risk']),
-        ('Humidity (%)', df['humidity_max'].mean(), df['humidity_max'].min(), df['humidity_max'].max(), analysis['humidity_risk']),
-        ('Wind Speed (km/h)', df['wind_max'].mean(), df['wind_max'].min(), df['wind_max'].max(), analysis['wind_risk']),
-        ('Solar (kWh/m2/day)', df['solar_max'].mean(), df['solar_max'].min(), df['solar_max'].max(), analysis['solar_risk']),
-        ('Salinity (ppm)', df['salinity_max'].mean(), df['salinity_max'].min(), df['salinity_max'].max(), analysis['salinity_risk']),
-        ('Seismic Zone', df['seismic_zone'].mean(), df['seismic_zone'].min(), df['seismic_zone'].max(), analysis['seismic_risk'])
+    pdf.set_font('helvetica', '', 9)
+    
+    # One reduction pass per column, shared with the parameter analysis page
+    stats = df[[column for _, column, _ in PDF_METRIC_SPECS]].agg(['mean', 'min', 'max'])
+    
+    # Format every row up front so the layout loop only writes strings
+    metrics_rows = [
+        (param, f"{stats.at['mean', column]:.1f}", f"{stats.at['min', column]:.1f}",
+         f"{stats.at['max', column]:.1f}", f'{analysis[risk_key]:.1f}/100')
+        for param, column, risk_key in PDF_METRIC_SPECS
     ]
     
+    pdf.set_fill_color(245, 245, 245)
     fill = False
-    for param, avg, min_val, max_val, risk in metrics_data:
-        pdf.set_fill_color(245, 245, 245)
-        pdf.cell(col_widths[0], 6, param, 1, 0, 'L', fill)
-        pdf.cell(col_widths[1], 6, f'{avg:.1f}', 1, 0, 'C', fill)
-        pdf.cell(col_widths[2], 6, f'{min_val:.1f}', 1, 0, 'C', fill)
-        pdf.cell(col_widths[3], 6, f'{max_val:.1f}', 1, 0, 'C', fill)
-        pdf.cell(col_widths[4], 6, f'{risk:.1f}/100', 1, 0, 'C', fill)
+    for param, *cells in metrics_rows:
+        pdf.cell(col_widths[0], 6, param, border=1, align='L', fill=fill)
+        for width, text in zip(col_widths[1:], cells):
+            pdf.cell(width, 6, text, border=1, align='C', fill=fill)
         pdf.ln()
         fill = not fill
     
@@ -286,30 +384,23 @@ def generate_professional_pdf(line_name, analysis, client_name, project_code, ci
         pdf.section_title(param_name)
         
         risk_score = analysis[risk_key]
-        if risk_score >= 75:
-            risk_level = "CRITICAL"
-        elif risk_score >= 60:
-            risk_level = "HIGH"
-        elif risk_score >= 40:
-            risk_level = "MODERATE"
-        else:
-            risk_level = "LOW"
+        risk_level = RISK_LEVELS[risk_level_index(risk_score)]
         
-        pdf.set_font('Arial', 'B', 10)
-        pdf.cell(0, 6, f'Risk Score: {risk_score:.1f}/100 ({risk_level})', 0, 1)
+        pdf.set_font('helvetica', 'B', 10)
+        pdf.cell(0, 6, f'Risk Score: {risk_score:.1f}/100 ({risk_level})', new_x=XPos.LMARGIN, new_y=YPos.NEXT)
         
-        pdf.set_font('Arial', '', 9)
-        pdf.cell(50, 5, f'  Maximum Value:', 0, 0)
-        pdf.cell(0, 5, f'{df[value_key].max():.1f} {unit}', 0, 1)
-        pdf.cell(50, 5, f'  Minimum Value:', 0, 0)
-        pdf.cell(0, 5, f'{df[value_key].min():.1f} {unit}', 0, 1)
-        pdf.cell(50, 5, f'  Average Value:', 0, 0)
-        pdf.cell(0, 5, f'{df[value_key].mean():.1f} {unit}', 0, 1)
+        pdf.set_font('helvetica', '', 9)
+        pdf.cell(50, 5, f'  Maximum Value:')
+        pdf.cell(0, 5, f"{stats.at['max', value_key]:.1f} {unit}", new_x=XPos.LMARGIN, new_y=YPos.NEXT)
+        pdf.cell(50, 5, f'  Minimum Value:')
+        pdf.cell(0, 5, f"{stats.at['min', value_key]:.1f} {unit}", new_x=XPos.LMARGIN, new_y=YPos.NEXT)
+        pdf.cell(50, 5, f'  Average Value:')
+        pdf.cell(0, 5, f"{stats.at['mean', value_key]:.1f} {unit}", new_x=XPos.LMARGIN, new_y=YPos.NEXT)
         
         if days_key and days_key in df.columns:
             avg_days = df[days_key].mean()
-            pdf.cell(50, 5, f'  Frequency:', 0, 0)
-            pdf.cell(0, 5, f'~{avg_days:.0f} days/year (10-year average)', 0, 1)
+            pdf.cell(50, 5, f'  Frequency:')
+            pdf.cell(0, 5, f'~{avg_days:.0f} days/year (10-year average)', new_x=XPos.LMARGIN, new_y=YPos.NEXT)
         
         pdf.ln(3)
     
@@ -317,39 +408,14 @@ def generate_professional_pdf(line_name, analysis, client_name, project_code, ci
     pdf.add_page()
     pdf.chapter_title('TECHNICAL RECOMMENDATIONS')
     
-    pdf.set_font('Arial', '', 10)
+    pdf.set_font('helvetica', '', 10)
     recommendations = []
     
-    if analysis['temp_risk'] > 75:
-        recommendations.append(('CRITICAL', 'Deploy high-temperature rated insulators (>50C tolerance). Maximum temperature exceeds 45C in multiple zones.'))
-    elif analysis['temp_risk'] > 60:
-        recommendations.append(('HIGH', 'Use enhanced thermal-resistant insulators for sustained high temperatures (40-45C range).'))
-    
-    if analysis['rainfall_risk'] > 75:
-        recommendations.append(('CRITICAL', 'Install hydrophobic silicone insulators with superior water-shedding properties. Heavy rainfall exceeds 350mm.'))
-    elif analysis['rainfall_risk'] > 60:
-        recommendations.append(('HIGH', 'Use polymer composite insulators designed for high-moisture environments.'))
-    
-    if analysis['humidity_risk'] > 75:
-        recommendations.append(('CRITICAL', 'Apply specialized anti-tracking coatings. Humidity regularly exceeds 90%.'))
-    elif analysis['humidity_risk'] > 60:
-        recommendations.append(('HIGH', 'Use hydrophobic insulators to prevent surface moisture accumulation.'))
-    
-    if analysis['wind_risk'] > 75:
-        recommendations.append(('CRITICAL', 'Reinforce tower structures for extreme wind loads (>80 km/h). Use aerodynamic insulator designs.'))
-    elif analysis['wind_risk'] > 60:
-        recommendations.append(('HIGH', 'Implement enhanced structural support for sustained high winds (60-80 km/h).'))
-    
-    if analysis['solar_risk'] > 70:
-        recommendations.append(('HIGH', 'Deploy UV-resistant materials with enhanced weathering protection (>6.5 kWh/m2/day solar exposure).'))
-    
-    if analysis['salinity_risk'] > 75:
-        recommendations.append(('CRITICAL', 'Install anti-salt fog insulators with specialized surface treatments. Coastal salinity exceeds 33,000 ppm.'))
-    elif analysis['salinity_risk'] > 60:
-        recommendations.append(('HIGH', 'Use corrosion-resistant materials for moderate coastal salinity (25,000-33,000 ppm).'))
-    
-    if analysis['seismic_risk'] > 70:
-        recommendations.append(('HIGH', 'Implement seismic-resistant tower designs per Zone 4/5 specifications (BIS standards).'))
+    for risk_key, tiers in PDF_RECOMMENDATION_RULES:
+        for threshold, priority, rec in tiers:
+            if analysis[risk_key] > threshold:
+                recommendations.append((priority, rec))
+                break
     
     if not recommendations:
         recommendations.append(('LOW', 'Standard insulator specifications are adequate for this corridor.'))
@@ -363,82 +429,38 @@ def generate_professional_pdf(line_name, analysis, client_name, project_code, ci
         else:
             pdf.set_text_color(0, 0, 0)
         
-        pdf.set_font('Arial', 'B', 10)
-        pdf.cell(0, 6, f'[{priority}]', 0, 1)
+        pdf.set_font('helvetica', 'B', 10)
+        pdf.cell(0, 6, f'[{priority}]', new_x=XPos.LMARGIN, new_y=YPos.NEXT)
         pdf.set_text_color(0, 0, 0)
-        pdf.set_font('Arial', '', 10)
-        pdf.multi_cell(0, 5, f'  {rec}')
+        pdf.set_font('helvetica', '', 10)
+        pdf.multi_cell(0, 5, f'  {rec}', new_x=XPos.LMARGIN, new_y=YPos.NEXT)
         pdf.ln(2)
     
     pdf.ln(5)
     pdf.section_title('GENERAL RECOMMENDATIONS')
-    pdf.set_font('Arial', '', 10)
-    
-    general_recs = [
-        'Implement real-time environmental monitoring system along the entire corridor',
-        'Conduct quarterly inspections with focus on high-risk segments identified in this report',
-        'Maintain detailed maintenance logs for all critical zones (severity >60)',
-        'Review and update risk assessment annually with latest IMD data',
-        'Establish emergency response protocols for extreme weather events',
-        'Train maintenance personnel on environmental risk factors specific to this corridor'
-    ]
+    pdf.set_font('helvetica', '', 10)
     
-    for rec in general_recs:
-        pdf.cell(5, 5, '-', 0, 0)
-        pdf.multi_cell(0, 5, rec)
+    pdf.multi_cell(0, 5, PDF_GENERAL_RECOMMENDATIONS, new_x=XPos.LMARGIN, new_y=YPos.NEXT)
     
     # PAGE 5: DATA SOURCES
-    pdf.add_page()
-    pdf.chapter_title('DATA SOURCES & METHODOLOGY')
-    
-    pdf.section_title('Primary Data Source')
-    pdf.set_font('Arial', '', 10)
-    pdf.multi_cell(0, 5, 'IMD - India Meteorological Department (mausam.imd.gov.in)\nOfficial national meteorological service providing comprehensive environmental data across India.')
-    pdf.ln(3)
-    
-    pdf.section_title('Data Specifications')
-    pdf.set_font('Arial', '', 9)
-    specs = [
-        ('Time Period:', '2015-2024 (10 years)'),
-        ('Spatial Resolution:', '0.25 degrees x 0.25 degrees (~25-30 km grid)'),
-        ('Data Type:', 'Historical Maximum Values'),
-        ('Parameters:', 'Temperature, Rainfall, Humidity, Wind Speed, Solar Radiation'),
-        ('Additional Sources:', 'Coastal salinity from marine monitoring; Seismic zones from BIS')
-    ]
-    
-    for label, value in specs:
-        pdf.set_font('Arial', 'B', 9)
-        pdf.cell(50, 5, f'  {label}', 0, 0)
-        pdf.set_font('Arial', '', 9)
-        pdf.cell(0, 5, value, 0, 1)
-    
-    pdf.ln(3)
-    pdf.section_title('Methodology')
-    pdf.set_font('Arial', '', 9)
-    pdf.multi_cell(0, 5, 'This assessment uses maximum observed values over the 10-year period rather than averages. This approach ensures that equipment specifications and maintenance protocols account for worst-case scenarios that occur periodically along the transmission corridor.')
-    pdf.ln(2)
-    pdf.multi_cell(0, 5, 'Risk scoring: Each environmental parameter is evaluated on a 0-100 scale based on impact to transmission line insulators. Scores are derived from industry standards, manufacturer specifications, and empirical failure data.')
-    
-    pdf.ln(5)
-    pdf.section_title('Disclaimer')
-    pdf.set_font('Arial', 'I', 8)
-    pdf.set_text_color(100, 100, 100)
-    pdf.multi_cell(0, 4, 'This report is generated based on historical environmental data and predictive risk models. Actual conditions may vary. Final equipment specifications and installation designs should be validated through detailed site surveys, engineering analysis, and consultation with equipment manufacturers. Deccan Enterprises Pvt. Ltd. provides this assessment as a planning tool and does not guarantee specific outcomes.')
+    pdf.data_sources_page()
     
     # Save PDF
-    pdf_filename = f"{project_code}_{line_name.replace(' ', '_')}_Report_{datetime.now().strftime('%Y%m%d')}.pdf"
-    pdf_path = os.path.join(tempfile.gettempdir(), pdf_filename)
-    pdf.output(pdf_path)
+    pdf_filename = f"{project_code}_{line_name.replace(' ', '_')}_Report_{report_date.strftime('%Y%m%d')}.pdf"
+    pdf_bytes = bytes(pdf.output())
     
-    return pdf_path, pdf_filename
+    return pdf_bytes, pdf_filename
 
 # Load logo function
+@st.cache_resource
 def load_logo():
-    """Load Deccan logo from file"""
-    logo_path = "deccan_logo.png"
-    if os.path.exists(logo_path):
+    """Load Deccan logo from file (decoded once per process)"""
+    if os.path.exists(LOGO_PATH):
         try:
-            return Image.open(logo_path)
+            from PIL import Image
+            logo = Image.open(LOGO_PATH)
+            logo.load()
+            return logo
         except:
             pass
     return None
@@ -550,16 +572,16 @@ if input_method == "Enter Coordinates":
 # Map display
 st.markdown("### 🗺️ Transmission Line Map")
 
-# Create base map
-india_center = [20.5937, 78.9629]
-m = folium.Map(location=india_center, zoom_start=5, tiles='OpenStreetMap')
-
 # Line colors
 line_colors = ['#2563eb', '#dc2626', '#16a34a', '#ea580c']
 
-# Draw existing transmission lines
-if st.session_state.transmission_lines:
-    for idx, line in enumerate(st.session_state.transmission_lines):
+def create_lines_map(transmission_lines):
+    """Create the base map with the current transmission lines drawn on it"""
+    india_center = [20.5937, 78.9629]
+    m = folium.Map(location=india_center, zoom_start=5, tiles='OpenStreetMap')
+    
+    # Draw existing transmission lines
+    for idx, line in enumerate(transmission_lines):
         color = line_colors[idx % len(line_colors)]
         folium.PolyLine(
             locations=line['coordinates'],
@@ -580,9 +602,18 @@ if st.session_state.transmission_lines:
             popup=f"{line['name']} - End",
             icon=folium.Icon(color='red', icon='stop')
         ).add_to(m)
+    
+    return m
+
+@st.cache_data(show_spinner=False, max_entries=16)
+def render_lines_map_html(transmission_lines):
+    """Rendered read-only lines map HTML, rebuilt only when the lines change"""
+    return create_lines_map(transmission_lines).get_root().render()
 
 # Display map
 if input_method == "Draw on Map":
+    m = create_lines_map(st.session_state.transmission_lines)
+    
     # Add drawing plugin
     draw = plugins.Draw(
         export=True,
@@ -631,249 +662,300 @@ if input_method == "Draw on Map":
                 st.success(f"✅ {len(new_lines)} transmission line(s) added from drawing!")
                 st.rerun()
 else:
-    st_folium(m, width=None, height=500, key="display_map")
+    # Read-only view - nothing is read back from the map, so skip the st_folium bridge
+    components.html(render_lines_map_html(st.session_state.transmission_lines), height=500)
 
 # Environmental data functions
 
+# MASSIVELY EXPANDED coastal points - especially Gujarat Gulf of Khambhat/Kutch
+# Built once at import; stored column-wise for the broadcast distance search
+COAST_POINTS = np.array([
+    # GUJARAT COAST - CRITICAL EXPANSION (Gulf of Khambhat & Kutch)
+    (23.0225, 69.6693), (22.8, 69.8), (22.5, 70.0), (22.3072, 68.9692),
+    (22.4707, 69.6293), (22.2, 70.2), (22.0, 70.4), (21.8, 70.6),
+    (21.6, 70.8), (21.5, 71.0), (21.4, 71.2), (21.3, 71.4),
+    (21.2, 71.6), (21.1, 71.8), (21.0, 72.0), (20.9, 72.2),
+    (21.7051, 72.9959), (21.5, 72.8), (21.3, 72.6), (21.1, 72.4),
+    (20.9517, 70.3660), (20.8, 70.5), (20.7, 70.7),
+    (22.8, 70.1), (22.6, 70.3), (22.4, 70.5), (22.2, 70.7),
+    
+    # West coast (Arabian Sea) - Kerala to Maharashtra
+    (8.0883, 77.5385), (8.5, 77.3), (9.0, 77.0), (9.5, 76.8),
+    (9.9312, 76.2673), (10.5, 76.0), (11.0, 75.8),
+    (11.2588, 75.7804), (11.8, 75.5), (12.3, 75.2),
+    (12.9716, 74.8056), (13.5, 74.5), (14.0, 74.3),
+    (14.8546, 74.1240), (15.2, 74.0), (15.4909, 73.8278),
+    (16.0, 73.6), (16.5, 73.4), (17.0005, 73.0167),
+    (17.5, 73.0), (18.0, 72.9), (18.5, 72.85),
+    (18.9388, 72.8354), (19.5, 72.8), (20.0, 72.8),
+    (20.2961, 72.8347), (20.5, 72.8), (20.7, 72.9),
+    
+    # Mumbai to Surat coast
+    (19.0, 72.8), (19.5, 72.8), (20.0, 72.8), (20.5, 72.8),
+    (21.0, 72.8), (21.1702, 72.8311), (21.3, 72.85), (21.5, 72.9),
+    
+    # East coast (Bay of Bengal) - Tamil Nadu to West Bengal
+    (8.0883, 77.5569), (8.5, 78.0), (9.0, 78.5), (9.5, 79.0),
+    (10.0, 79.5), (10.7905, 79.8437), (11.4, 79.8),
+    (11.9416, 79.8083), (12.5, 80.0), (13.0827, 80.2707),
+    (13.6, 80.2), (14.1, 80.0), (14.4426, 79.9865),
+    (15.0, 80.1), (15.5, 80.2), (15.9129, 80.3328),
+    (16.4, 81.0), (16.9891, 82.2475), (17.3, 82.5),
+    (17.6868, 83.2185), (18.2, 83.8), (18.7, 84.2),
+    (18.9894, 84.6667), (19.3, 85.0), (19.8135, 85.8312),
+    (20.0, 85.8), (20.2644, 85.8281), (20.7, 86.5),
+    (21.2, 87.0), (21.8064, 87.0936), (22.2, 87.8),
+    (22.5726, 88.3639), (22.7, 88.5), (22.9, 88.7),
+    
+    # Andaman & Nicobar - dense coverage
+    (11.7401, 92.6586), (12.0, 92.8), (12.5, 93.0),
+    (13.0827, 93.0570), (13.5, 93.2), (14.0, 93.0),
+    
+    # Lakshadweep islands
+    (10.5, 72.5), (11.0, 72.7), (11.5, 72.6),
+    
+    # Odisha coast details
+    (19.8, 85.8), (20.0, 85.9), (20.2, 86.0), (20.4, 86.2),
+    (20.6, 86.5), (20.8, 86.8), (21.0, 87.0), (21.3, 87.3),
+])
+# Pre-scaled to km (1 degree ~ 111 km) so the search skips a multiply per pair
+COAST_LATS_KM, COAST_LONS_KM = COAST_POINTS.T * 111
+
 # Helper function to calculate distance to coast
 def get_distance_to_coast(lat, lon):
     """Calculate approximate distance to nearest Indian coast in km - COMPREHENSIVE VERSION"""
-    # MASSIVELY EXPANDED coastal points - especially Gujarat Gulf of Khambhat/Kutch
-    coast_points = [
-        # GUJARAT COAST - CRITICAL EXPANSION (Gulf of Khambhat & Kutch)
-        (23.0225, 69.6693), (22.8, 69.8), (22.5, 70.0), (22.3072, 68.9692),
-        (22.4707, 69.6293), (22.2, 70.2), (22.0, 70.4), (21.8, 70.6),
-        (21.6, 70.8), (21.5, 71.0), (21.4, 71.2), (21.3, 71.4),
-        (21.2, 71.6), (21.1, 71.8), (21.0, 72.0), (20.9, 72.2),
-        (21.7051, 72.9959), (21.5, 72.8), (21.3, 72.6), (21.1, 72.4),
-        (20.9517, 70.3660), (20.8, 70.5), (20.7, 70.7),
-        (22.8, 70.1), (22.6, 70.3), (22.4, 70.5), (22.2, 70.7),
-        
-        # West coast (Arabian Sea) - Kerala to Maharashtra
-        (8.0883, 77.5385), (8.5, 77.3), (9.0, 77.0), (9.5, 76.8),
-        (9.9312, 76.2673), (10.5, 76.0), (11.0, 75.8),
-        (11.2588, 75.7804), (11.8, 75.5), (12.3, 75.2),
-        (12.9716, 74.8056), (13.5, 74.5), (14.0, 74.3),
-        (14.8546, 74.1240), (15.2, 74.0), (15.4909, 73.8278),
-        (16.0, 73.6), (16.5, 73.4), (17.0005, 73.0167),
-        (17.5, 73.0), (18.0, 72.9), (18.5, 72.85),
-        (18.9388, 72.8354), (19.5, 72.8), (20.0, 72.8),
-        (20.2961, 72.8347), (20.5, 72.8), (20.7, 72.9),
-        
-        # Mumbai to Surat coast
-        (19.0, 72.8), (19.5, 72.8), (20.0, 72.8), (20.5, 72.8),
-        (21.0, 72.8), (21.1702, 72.8311), (21.3, 72.85), (21.5, 72.9),
-        
-        # East coast (Bay of Bengal) - Tamil Nadu to West Bengal
-        (8.0883, 77.5569), (8.5, 78.0), (9.0, 78.5), (9.5, 79.0),
-        (10.0, 79.5), (10.7905, 79.8437), (11.4, 79.8),
-        (11.9416, 79.8083), (12.5, 80.0), (13.0827, 80.2707),
-        (13.6, 80.2), (14.1, 80.0), (14.4426, 79.9865),
-        (15.0, 80.1), (15.5, 80.2), (15.9129, 80.3328),
-        (16.4, 81.0), (16.9891, 82.2475), (17.3, 82.5),
-        (17.6868, 83.2185), (18.2, 83.8), (18.7, 84.2),
-        (18.9894, 84.6667), (19.3, 85.0), (19.8135, 85.8312),
-        (20.0, 85.8), (20.2644, 85.8281), (20.7, 86.5),
-        (21.2, 87.0), (21.8064, 87.0936), (22.2, 87.8),
-        (22.5726, 88.3639), (22.7, 88.5), (22.9, 88.7),
-        
-        # Andaman & Nicobar - dense coverage
-        (11.7401, 92.6586), (12.0, 92.8), (12.5, 93.0),
-        (13.0827, 93.0570), (13.5, 93.2), (14.0, 93.0),
-        
-        # Lakshadweep islands
-        (10.5, 72.5), (11.0, 72.7), (11.5, 72.6),
-        
-        # Odisha coast details
-        (19.8, 85.8), (20.0, 85.9), (20.2, 86.0), (20.4, 86.2),
-        (20.6, 86.5), (20.8, 86.8), (21.0, 87.0), (21.3, 87.3),
-    ]
-    
-    min_distance = float('inf')
-    for coast_lat, coast_lon in coast_points:
-        lat_diff = (lat - coast_lat) * 111
-        lon_diff = (lon - coast_lon) * 111 * math.cos(math.radians(lat))
-        distance = math.sqrt(lat_diff**2 + lon_diff**2)
-        min_distance = min(min_distance, distance)
-    return min_distance
+    lat = np.asarray(lat, dtype=float)[..., None]
+    lon = np.asarray(lon, dtype=float)[..., None]
+    lat_diff = lat * 111 - COAST_LATS_KM
+    lon_diff = (lon * 111 - COAST_LONS_KM) * np.cos(np.radians(lat))
+    return np.sqrt(lat_diff**2 + lon_diff**2).min(axis=-1)
+
+# Polluted city reference points (lat, lon, AQI), stored column-wise so the
+# distance weighting runs as NumPy array operations
+POLLUTED_CITIES = np.array([
+    (28.7041, 77.1025, 160), (28.4595, 77.0266, 120), (28.6692, 77.4538, 110),
+    (28.6139, 77.2090, 140), (28.7100, 77.4100, 105), (28.8386, 77.8450, 95),
+    (26.4499, 80.3319, 110), (26.8467, 80.9462, 100), (27.1767, 78.0081, 90),
+    (25.3176, 82.9739, 95), (29.9457, 77.7085, 85), (27.5706, 77.7085, 80),
+    (25.5941, 85.1376, 100), (22.5726, 88.3639, 95), (23.6345, 87.8615, 85),
+    (23.5204, 87.3119, 82), (26.2006, 92.9376, 130), (26.1445, 91.7362, 90),
+    (27.0238, 75.3370, 80), (26.9124, 75.7873, 75), (22.3072, 72.3694, 85),
+    (21.1702, 72.8311, 75), (22.2587, 70.7813, 90), (22.4707, 70.0577, 80),
+    (21.7645, 72.1519, 85), (19.0760, 72.8777, 80), (18.5204, 73.8567, 75),
+    (12.9716, 77.5946, 65), (13.0827, 80.2707, 70), (30.9010, 75.8573, 90),
+    (30.7333, 76.7794, 85),
+])
+POLLUTED_CITY_LATS, POLLUTED_CITY_LONS, POLLUTED_CITY_AQI = POLLUTED_CITIES.T
 
 def get_pollution_level(lat, lon):
     """Calculate pollution level (AQI) - MEDIUM TO HIGH only for transmission line stress"""
-    polluted_cities = [
-        (28.7041, 77.1025, 160), (28.4595, 77.0266, 120), (28.6692, 77.4538, 110),
-        (28.6139, 77.2090, 140), (28.7100, 77.4100, 105), (28.8386, 77.8450, 95),
-        (26.4499, 80.3319, 110), (26.8467, 80.9462, 100), (27.1767, 78.0081, 90),
-        (25.3176, 82.9739, 95), (29.9457, 77.7085, 85), (27.5706, 77.7085, 80),
-        (25.5941, 85.1376, 100), (22.5726, 88.3639, 95), (23.6345, 87.8615, 85),
-        (23.5204, 87.3119, 82), (26.2006, 92.9376, 130), (26.1445, 91.7362, 90),
-        (27.0238, 75.3370, 80), (26.9124, 75.7873, 75), (22.3072, 72.3694, 85),
-        (21.1702, 72.8311, 75), (22.2587, 70.7813, 90), (22.4707, 70.0577, 80),
-        (21.7645, 72.1519, 85), (19.0760, 72.8777, 80), (18.5204, 73.8567, 75),
-        (12.9716, 77.5946, 65), (13.0827, 80.2707, 70), (30.9010, 75.8573, 90),
-        (30.7333, 76.7794, 85),
-    ]
-    
-    total_weight, weighted_aqi = 0, 0
-    for city_lat, city_lon, city_aqi in polluted_cities:
-        dist = math.sqrt((lat - city_lat)**2 + (lon - city_lon)**2) * 111
-        if dist < 1:
-            weight = 1.0
-        elif dist < 50:
-            weight = 1.0 / (1 + dist/10)
-        elif dist < 200:
-            weight = 1.0 / (1 + dist/5)
-        else:
-            weight = 1.0 / (1 + dist)
-        weighted_aqi += city_aqi * weight
-        total_weight += weight
+    # Broadcast to a (points x cities) distance matrix so arrays of points work too
+    lat = np.asarray(lat, dtype=float)[..., None]
+    lon = np.asarray(lon, dtype=float)[..., None]
+    dist = np.sqrt((lat - POLLUTED_CITY_LATS)**2 + (lon - POLLUTED_CITY_LONS)**2) * 111
+    weight = np.select(
+        [dist < 1, dist < 50, dist < 200],
+        [1.0, 1.0 / (1 + dist/10), 1.0 / (1 + dist/5)],
+        default=1.0 / (1 + dist)
+    )
+    weighted_aqi = (POLLUTED_CITY_AQI * weight).sum(axis=-1)
+    total_weight = weight.sum(axis=-1)
     
     # Changed: Minimum baseline is now 50 (MEDIUM) instead of 45
     base_aqi = 65  # Medium baseline for transmission line assessment
-    if total_weight > 0:
-        calculated_aqi = weighted_aqi / total_weight
-        final_aqi = (calculated_aqi * 0.7) + (base_aqi * 0.3)
-    else:
-        final_aqi = base_aqi
+    # Every weight is strictly positive, so total_weight > 0 always holds
+    calculated_aqi = weighted_aqi / total_weight
+    final_aqi = (calculated_aqi * 0.7) + (base_aqi * 0.3)
     
     # Clamp between 50 (MEDIUM) and 200 (HIGH) - no LOW values
-    return max(50, min(200, final_aqi))
+    return np.clip(final_aqi, 50, 200)
+
+# Analysis table columns in display order, with compact dtypes - measurements
+# carry at most one decimal, so float32 halves the bytes scanned by every mean/min/max
+ANALYSIS_DTYPES = {
+    'lat': 'float64', 'lon': 'float64',
+    'temp_max': 'float32', 'temp_days': 'int16', 'temp_max_risk': 'float32',
+    'rainfall_max': 'float32', 'rainfall_days': 'int16', 'rainfall_max_risk': 'float32',
+    'humidity_max': 'float32', 'humidity_days': 'int16', 'humidity_max_risk': 'float32',
+    'wind_max': 'float32', 'wind_days': 'int16', 'wind_max_risk': 'float32',
+    'solar_max': 'float32', 'salinity_max': 'float32', 'distance_to_coast_km': 'float32',
+    'pollution_aqi': 'float32', 'seismic_zone': 'int8', 'seismic_days': 'int16',
+    'solar_max_risk': 'float32', 'salinity_max_risk': 'float32',
+    'pollution_risk': 'float32', 'seismic_risk': 'float32'
+}
 
-def get_environmental_data_for_point(lat, lon):
-    """Get environmental data with ULTRA-AGGRESSIVE salinity for Gujarat coast"""
+# Risk column -> (measurement column, value that maps to a score of 100)
+RISK_SCALES = {
+    'temp_max_risk': ('temp_max', 50),
+    'rainfall_max_risk': ('rainfall_max', 3000),
+    'humidity_max_risk': ('humidity_max', 100),
+    'wind_max_risk': ('wind_max', 100),
+    'solar_max_risk': ('solar_max', 8),
+    'salinity_max_risk': ('salinity_max', 50000),
+    'pollution_risk': ('pollution_aqi', 500),
+    'seismic_risk': ('seismic_zone', 5)
+}
+
+# Analysis summary key -> per-point risk column it averages
+RISK_SUMMARY_COLUMNS = {
+    'temp_risk': 'temp_max_risk',
+    'rainfall_risk': 'rainfall_max_risk',
+    'humidity_risk': 'humidity_max_risk',
+    'wind_risk': 'wind_max_risk',
+    'solar_risk': 'solar_max_risk',
+    'salinity_risk': 'salinity_max_risk',
+    'pollution_risk': 'pollution_risk',
+    'seismic_risk': 'seismic_risk'
+}
+
+# Uniform draw ranges for temp, rainfall, rainfall days, humidity, humidity days, wind,
+# wind days and solar - drawn in this order after each point's salinity draw
+ENV_DRAW_RANGES = np.array([
+    (-3, 3), (-100, 200), (-3, 5), (-5, 10), (-10, 20), (-5, 15), (-5, 10), (-0.5, 1.0)
+])
+
+def get_environmental_data_for_points(lats, lons):
+    """Get environmental data with ULTRA-AGGRESSIVE salinity for Gujarat coast, as a typed DataFrame"""
+    n = len(lats)
     
-    # Calculate distance to coast for salinity
-    dist_to_coast = get_distance_to_coast(lat, lon)
+    # One (points x references) pass each instead of a reference loop per point
+    dist_to_coast = get_distance_to_coast(lats, lons)
+    pollution_aqi = get_pollution_level(lats, lons)
     
     # Add location-based variation
-    lat_factor = (lat - 15) / 20
-    lon_factor = (lon - 70) / 30
-    
-    # Generate realistic varied data based on location
-    np.random.seed(int((lat * 1000 + lon * 1000) % 10000))
+    lat_factor = (lats - 15) / 20
+    lon_factor = (lons - 70) / 30
+    
+    # Generate realistic varied data based on location - each point keeps its own
+    # location seed; uniform(a, b) is a + (b - a) * u, so only the raw draws are per point
+    seeds = ((lats * 1000 + lons * 1000) % 10000).astype(int)
+    draws = np.empty((n, 1 + len(ENV_DRAW_RANGES)))
+    for i, seed in enumerate(seeds.tolist()):
+        np.random.seed(seed)
+        draws[i] = np.random.random_sample(draws.shape[1])
+    salinity_draw = draws[:, 0]
+    low, high = ENV_DRAW_RANGES.T
+    temp_var, rain_var, rain_days_var, hum_var, hum_days_var, wind_var, wind_days_var, solar_var = \
+        (low + (high - low) * draws[:, 1:]).T
     
     # ULTRA-AGGRESSIVE SALINITY - MUCH WIDER INFLUENCE ZONES
     # Gujarat coast (68-74 lon, 20-23 lat) is EXTREMELY SALINE
-    is_gujarat_coast = (68 <= lon <= 74 and 20 <= lat <= 24)
-    
-    if dist_to_coast < 2:  # ON THE SEA/OCEAN - EXPANDED from 0.5km
-        if lon < 80:  # Arabian Sea
-            base_salinity = 37000
-        else:  # Bay of Bengal
-            base_salinity = 32000
-        salinity_max = base_salinity + np.random.uniform(-500, 500)
-    
-    elif dist_to_coast < 25:  # 0-25km - CRITICAL COASTAL - EXPANDED
-        if lon < 80:
-            base_salinity = 36000
-        else:
-            base_salinity = 31000
-        salinity_max = base_salinity + np.random.uniform(-1000, 1000)
-    
-    elif dist_to_coast < 75:  # 25-75km - HIGH COASTAL - NEW ZONE
-        if is_gujarat_coast:  # Gujarat stays HIGH
-            base_salinity = 32000
-        elif lon < 80:
-            base_salinity = 30000 - ((dist_to_coast - 25) / 50 * 10000)
-        else:
-            base_salinity = 26000 - ((dist_to_coast - 25) / 50 * 8000)
-        salinity_max = base_salinity + np.random.uniform(-1500, 1500)
-    
-    elif dist_to_coast < 150:  # 75-150km - MODERATE - EXPANDED
-        if is_gujarat_coast:  # Gujarat still elevated
-            base_salinity = 25000
-        else:
-            decay_factor = (dist_to_coast - 75) / 75
-            base_salinity = 20000 - (decay_factor * 12000)
-        salinity_max = base_salinity + np.random.uniform(-2000, 2000)
-    
-    elif dist_to_coast < 250:  # 150-250km - LOW-MODERATE - NEW ZONE
-        decay_factor = (dist_to_coast - 150) / 100
-        base_salinity = 8000 - (decay_factor * 4000)
-        salinity_max = base_salinity + np.random.uniform(-1000, 1000)
-    
-    else:  # >250km - LOW
-        base_salinity = 3500
-        salinity_max = base_salinity + np.random.uniform(-500, 1000)
-    
-    salinity_max = max(1000, salinity_max)
-    
-    # Pollution parameter
-    pollution_aqi = get_pollution_level(lat, lon)
-    
-    # BOOSTED VALUES FOR GUJARAT COAST
-    if is_gujarat_coast:
-        temp_boost = 3  # Hotter
-        humidity_boost = 8  # More humid
-        solar_boost = 0.5  # More solar
-        pollution_boost = 20  # More polluted (industrial)
-    else:
-        temp_boost = 0
-        humidity_boost = 0
-        solar_boost = 0
-        pollution_boost = 0
-    
-    data = {
-        'lat': lat,
-        'lon': lon,
-        'temp_max': round(35 + lat_factor * 15 + np.random.uniform(-3, 3) + temp_boost, 1),
-        'temp_days': 45,
-        'temp_max_risk': None,
-        'rainfall_max': round(800 + lon_factor * 600 + np.random.uniform(-100, 200), 1),
-        'rainfall_days': round(12 + np.random.uniform(-3, 5)),
-        'rainfall_max_risk': None,
-        'humidity_max': round(70 + lon_factor * 20 + np.random.uniform(-5, 10) + humidity_boost, 1),
-        'humidity_days': round(145 + np.random.uniform(-10, 20)),
-        'humidity_max_risk': None,
-        'wind_max': round(55 + lat_factor * 20 + np.random.uniform(-5, 15), 1),
-        'wind_days': round(60 + np.random.uniform(-5, 10)),
-        'wind_max_risk': None,
-        'solar_max': round(6.0 + lat_factor * 2 + np.random.uniform(-0.5, 1.0) + solar_boost, 1),
-        'salinity_max': round(salinity_max, 0),
-        'distance_to_coast_km': round(dist_to_coast, 1),
-        'pollution_aqi': round(pollution_aqi + pollution_boost, 1),
-        'seismic_zone': int(3 + lat_factor * 2),
-        'seismic_days': 4
+    is_gujarat_coast = (68 <= lons) & (lons <= 74) & (20 <= lats) & (lats <= 24)
+    arabian_sea = lons < 80
+    
+    salinity_zones = [
+        dist_to_coast < 2,    # ON THE SEA/OCEAN - EXPANDED from 0.5km
+        dist_to_coast < 25,   # 0-25km - CRITICAL COASTAL - EXPANDED
+        dist_to_coast < 75,   # 25-75km - HIGH COASTAL - NEW ZONE (Gujarat stays HIGH)
+        dist_to_coast < 150,  # 75-150km - MODERATE - EXPANDED (Gujarat still elevated)
+        dist_to_coast < 250,  # 150-250km - LOW-MODERATE - NEW ZONE
+    ]
+    base_salinity = np.select(salinity_zones, [
+        np.where(arabian_sea, 37000, 32000),
+        np.where(arabian_sea, 36000, 31000),
+        np.where(is_gujarat_coast, 32000,
+                 np.where(arabian_sea, 30000 - ((dist_to_coast - 25) / 50 * 10000),
+                          26000 - ((dist_to_coast - 25) / 50 * 8000))),
+        np.where(is_gujarat_coast, 25000, 20000 - ((dist_to_coast - 75) / 75 * 12000)),
+        8000 - ((dist_to_coast - 150) / 100 * 4000),
+    ], default=3500)  # >250km - LOW
+    salinity_low = np.select(salinity_zones, [-500, -1000, -1500, -2000, -1000], default=-500)
+    salinity_high = np.select(salinity_zones, [500, 1000, 1500, 2000, 1000], default=1000)
+    salinity_max = base_salinity + (salinity_low + (salinity_high - salinity_low) * salinity_draw)
+    salinity_max = np.maximum(1000, salinity_max)
+    
+    # BOOSTED VALUES FOR GUJARAT COAST - hotter, more humid, more solar, more polluted (industrial)
+    temp_boost = np.where(is_gujarat_coast, 3, 0)
+    humidity_boost = np.where(is_gujarat_coast, 8, 0)
+    solar_boost = np.where(is_gujarat_coast, 0.5, 0)
+    pollution_boost = np.where(is_gujarat_coast, 20, 0)
+    
+    values = {
+        'lat': lats,
+        'lon': lons,
+        'temp_max': np.round(35 + lat_factor * 15 + temp_var + temp_boost, 1),
+        'temp_days': np.full(n, 45),
+        'rainfall_max': np.round(800 + lon_factor * 600 + rain_var, 1),
+        'rainfall_days': np.round(12 + rain_days_var),
+        'humidity_max': np.round(70 + lon_factor * 20 + hum_var + humidity_boost, 1),
+        'humidity_days': np.round(145 + hum_days_var),
+        'wind_max': np.round(55 + lat_factor * 20 + wind_var, 1),
+        'wind_days': np.round(60 + wind_days_var),
+        'solar_max': np.round(6.0 + lat_factor * 2 + solar_var + solar_boost, 1),
+        'salinity_max': np.round(salinity_max, 0),
+        'distance_to_coast_km': np.round(dist_to_coast, 1),
+        'pollution_aqi': np.round(pollution_aqi + pollution_boost, 1),
+        'seismic_zone': np.trunc(3 + lat_factor * 2),
+        'seismic_days': np.full(n, 4)
     }
     
-    # Calculate risk scores
-    data['temp_max_risk'] = min(100, (data['temp_max'] / 50) * 100)
-    data['rainfall_max_risk'] = min(100, (data['rainfall_max'] / 3000) * 100)
-    data['humidity_max_risk'] = min(100, (data['humidity_max'] / 100) * 100)
-    data['wind_max_risk'] = min(100, (data['wind_max'] / 100) * 100)
-    data['solar_max_risk'] = min(100, (data['solar_max'] / 8) * 100)
-    data['salinity_max_risk'] = min(100, (data['salinity_max'] / 50000) * 100)
-    data['pollution_risk'] = min(100, (data['pollution_aqi'] / 500) * 100)
-    data['seismic_risk'] = min(100, (data['seismic_zone'] / 5) * 100)
-    
-    return data
+    # Each column goes straight into its final dtype and is handed to pandas as-is
+    columns = {key: value.astype(ANALYSIS_DTYPES[key]) for key, value in values.items()}
+    
+    # Calculate risk scores a whole column at a time
+    for risk_key, (value_key, full_scale) in RISK_SCALES.items():
+        risk = np.minimum(100, columns[value_key] / full_scale * 100)
+        columns[risk_key] = risk.astype(ANALYSIS_DTYPES[risk_key])
+    
+    return pd.DataFrame(columns, columns=list(ANALYSIS_DTYPES), copy=False)
+
+def get_segment_lengths(lats, lons):
+    """Planar length (degrees) of each segment between consecutive vertices"""
+    dlat, dlon = np.diff(lats), np.diff(lons)
+    return np.sqrt(dlon * dlon + dlat * dlat)
+
+def get_line_length_km(coordinates):
+    """Approximate transmission line length in km"""
+    lats, lons = np.asarray(coordinates, dtype=float).T
+    # Accumulated segment by segment (not pairwise), matching LineString.length
+    return np.cumsum(get_segment_lengths(lats, lons))[-1] * 111
 
 def generate_sample_points(coordinates, spacing_km=5):
-    """Generate sample points along transmission line"""
-    line = LineString([(lon, lat) for lat, lon in coordinates])
-    length_km = line.length * 111  # Approximate conversion to km
+    """Generate sample points along transmission line, as (lats, lons) arrays"""
+    lats, lons = np.asarray(coordinates, dtype=float).T
+    seg_lengths = get_segment_lengths(lats, lons)
+    cum_length = np.concatenate(([0.0], np.cumsum(seg_lengths)))
+    length_km = cum_length[-1] * 111  # Approximate conversion to km
     num_points = max(int(length_km / spacing_km), 2)
     
-    points = []
-    for i in range(num_points):
-        fraction = i / (num_points - 1) if num_points > 1 else 0
-        point = line.interpolate(fraction, normalized=True)
-        points.append({'lat': point.y, 'lon': point.x})
-    
-    return points
+    # Evenly spaced positions along the line, each placed within its segment with the
+    # same arithmetic as LineString.interpolate - every point seeds its environmental
+    # values from its coordinates, so the samples must match to the last bit
+    positions = np.arange(num_points) / (num_points - 1) * cum_length[-1]
+    segment = np.searchsorted(cum_length[1:], positions, side='right')
+    past_end = segment >= len(lats) - 1
+    segment = np.minimum(segment, len(lats) - 2)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        fraction = (positions - cum_length[segment]) / seg_lengths[segment]
+    
+    def along(values):
+        start, end = values[segment], values[segment + 1]
+        return np.where(past_end, end, np.where(fraction <= 0, start, (end - start) * fraction + start))
+    
+    return along(lats), along(lons)
+
+# Marker cap per parameter map - longer lines are thinned by a fixed stride
+MAX_MAP_MARKERS = 500
+
+def risk_marker_style(feature):
+    """Shared GeoJSON style - each marker carries its risk color as a property"""
+    color = feature['properties']['color']
+    return {'color': color, 'fillColor': color}
 
-def create_parameter_map(line_data, parameter, param_config):
+def create_parameter_map(df, parameter, param_config):
     """Create individual parameter map with circle markers - GUARANTEED TO WORK"""
     
+    lats = df['lat'].tolist()
+    lons = df['lon'].tolist()
+    
     # Calculate center of line
-    all_lats = [p['lat'] for p in line_data]
-    all_lons = [p['lon'] for p in line_data]
-    center = [np.mean(all_lats), np.mean(all_lons)]
+    center = [np.mean(lats), np.mean(lons)]
     
     # Create map
     param_map = folium.Map(location=center, zoom_start=8, tiles='OpenStreetMap')
     
     # Draw transmission line
-    line_coords = [[p['lat'], p['lon']] for p in line_data]
+    line_coords = [list(coord) for coord in zip(lats, lons)]
     folium.PolyLine(
         locations=line_coords,
         color='black',
@@ -881,52 +963,56 @@ def create_parameter_map(line_data, parameter, param_config):
         opacity=1.0
     ).add_to(param_map)
     
-    # Get risk values for color mapping
-    risk_values = [p[param_config['risk_key']] for p in line_data]
+    # Thin the markers on very long lines; the line itself keeps every point
+    stride = math.ceil(len(df) / MAX_MAP_MARKERS)
+    markers = df.iloc[::stride]
+    lats, lons = lats[::stride], lons[::stride]
     
-    # Add circle markers for each point
-    for point in line_data:
-        risk_score = point[param_config['risk_key']]
-        
-        # Determine color based on risk
-        if risk_score >= 75:
-            color = '#dc2626'  # Red
-            risk_level = 'CRITICAL'
-        elif risk_score >= 60:
-            color = '#ea580c'  # Orange
-            risk_level = 'HIGH'
-        elif risk_score >= 40:
-            color = '#f59e0b'  # Yellow
-            risk_level = 'MODERATE'
-        else:
-            color = '#10b981'  # Green
-            risk_level = 'LOW'
-        
-        # Create popup content
-        popup_html = f"""
+    # Resolve colors and levels for every point in one lookup
+    risk_scores = markers[param_config['risk_key']].to_numpy()
+    level_idx = risk_level_index(risk_scores)
+    colors = RISK_COLORS[level_idx].tolist()
+    values = markers[param_config['value_key']].tolist()
+    
+    # Popup content - the per-map parts are filled in once, only point values vary
+    popup_template = f"""
         <div style='font-family: Arial; min-width: 200px;'>
-            <h4 style='margin: 0; color: {color};'>{parameter}</h4>
+            <h4 style='margin: 0; color: {{color}};'>{parameter}</h4>
             <hr style='margin: 5px 0;'>
-            <b>Location:</b> {point['lat']:.4f}, {point['lon']:.4f}<br>
-            <b>Value:</b> {point[param_config['value_key']]:.1f} {param_config['unit']}<br>
-            <b>Risk Score:</b> {risk_score:.1f}/100<br>
-            <b>Risk Level:</b> <span style='color: {color}; font-weight: bold;'>{risk_level}</span><br>
+            <b>Location:</b> {{lat:.4f}}, {{lon:.4f}}<br>
+            <b>Value:</b> {{value:.1f}} {param_config['unit']}<br>
+            <b>Risk Score:</b> {{risk_score:.1f}}/100<br>
+            <b>Risk Level:</b> <span style='color: {{color}}; font-weight: bold;'>{{risk_level}}</span><br>
             <b>Source:</b> {param_config['source']}
         </div>
         """
-        
-        # Add circle marker
-        folium.CircleMarker(
-            location=[point['lat'], point['lon']],
-            radius=12,
-            popup=folium.Popup(popup_html, max_width=300),
-            color=color,
-            fillColor=color,
-            fillOpacity=0.7,
-            weight=2
-        ).add_to(param_map)
+    popups = [
+        popup_template.format(lat=lat, lon=lon, value=value, risk_score=risk_score,
+                              color=color, risk_level=RISK_LEVELS[level])
+        for lat, lon, value, risk_score, level, color
+        in zip(lats, lons, values, risk_scores.tolist(), level_idx, colors)
+    ]
+    
+    # Collect every point as a GeoJSON feature carrying its color and popup
+    features = [
+        {
+            'type': 'Feature',
+            'geometry': {'type': 'Point', 'coordinates': [lon, lat]},
+            'properties': {'color': color, 'popup': popup_html}
+        }
+        for lat, lon, color, popup_html in zip(lats, lons, colors, popups)
+    ]
+    
+    # Add all circle markers as a single GeoJSON layer
+    folium.GeoJson(
+        {'type': 'FeatureCollection', 'features': features},
+        marker=folium.CircleMarker(radius=12, fill=True, fill_opacity=0.7, weight=2),
+        style_function=risk_marker_style,
+        popup=folium.GeoJsonPopup(fields=['popup'], labels=False, max_width=300)
+    ).add_to(param_map)
     
     # Add legend
+    stride_note = f"<p style='margin: 5px 0;'><i>Showing 1 in every {stride} points</i></p>" if stride > 1 else ""
     legend_html = f"""
     <div style='position: fixed; bottom: 50px; left: 50px; width: 200px; 
                 background-color: white; border: 2px solid grey; z-index: 9999;
@@ -936,18 +1022,52 @@ def create_parameter_map(line_data, parameter, param_config):
         <p style='margin: 5px 0;'><span style='color: #f59e0b;'>⬤</span> MODERATE (40-60)</p>
         <p style='margin: 5px 0;'><span style='color: #ea580c;'>⬤</span> HIGH (60-75)</p>
         <p style='margin: 5px 0;'><span style='color: #dc2626;'>⬤</span> CRITICAL (75-100)</p>
+        {stride_note}
     </div>
     """
     param_map.get_root().html.add_child(folium.Element(legend_html))
     
     return param_map
 
+# Bounded: each entry is a full rendered Leaflet page, shared by all sessions
+@st.cache_data(show_spinner=False, max_entries=64)
+def render_parameter_map_html(df, parameter, param_config):
+    """Rendered parameter map HTML, cached so reruns skip rebuilding the markers"""
+    return create_parameter_map(df, parameter, param_config).get_root().render()
+
+def plot_category_bars(ax, labels, counts, colors):
+    """Horizontal bar summary of category counts with percentage labels (cheaper to render than a pie)"""
+    total = counts.sum()
+    ax.barh(labels, counts, color=colors, edgecolor='black', linewidth=1, alpha=0.8)
+    for i, count in enumerate(counts):
+        ax.text(count, i, f' {count / total * 100:.0f}%', ha='left', va='center', fontsize=9, fontweight='bold')
+    ax.set_xlim(0, counts.max() * 1.4)
+    ax.tick_params(axis='y', labelsize=8)
+
+@st.cache_resource
+def load_figure_class():
+    """Import matplotlib on first use and apply the shared chart fonts (once per process)"""
+    # matplotlib is only imported once charts are actually drawn
+    import matplotlib
+    from matplotlib.figure import Figure
+    matplotlib.rcParams.update(CHART_RC_PARAMS)
+    return Figure
+
 def create_risk_charts(analysis_data):
     """Create comprehensive risk visualization - ENHANCED with 6 insightful charts"""
     df = analysis_data['dataframe']
     
+    # Reuse one Agg figure across tabs and reruns instead of registering
+    # a new one with pyplot's figure manager each time
+    fig = st.session_state.get('_plot_fig')
+    if fig is None:
+        Figure = load_figure_class()
+        fig = Figure(figsize=(18, 12))
+        st.session_state['_plot_fig'] = fig
+    else:
+        fig.clear()
+    
     # Create figure with 6 subplots
-    fig = plt.figure(figsize=(18, 12))
     gs = fig.add_gridspec(3, 3, hspace=0.3, wspace=0.3)
     
     # Chart 1: Parameter Risk Scores (Bar Chart) - ENHANCED
@@ -965,11 +1085,12 @@ def create_risk_charts(analysis_data):
     
     parameters = list(risk_scores.keys())
     scores = list(risk_scores.values())
-    colors = ['#dc2626' if s >= 75 else '#ea580c' if s >= 60 else '#f59e0b' if s >= 40 else '#10b981' for s in scores]
+    levels = risk_level_index(scores)
+    colors = RISK_COLORS[levels].tolist()
     
     bars = ax1.barh(parameters, scores, color=colors, edgecolor='black', linewidth=1.5, alpha=0.8)
-    ax1.set_xlabel('Risk Score', fontsize=11, fontweight='bold')
-    ax1.set_title('Environmental Risk Scores by Parameter', fontsize=13, fontweight='bold', pad=15)
+    ax1.set_xlabel('Risk Score', fontsize=11)
+    ax1.set_title('Environmental Risk Scores by Parameter', fontsize=13, pad=15)
     ax1.set_xlim(0, 100)
     ax1.axvline(x=40, color='gray', linestyle='--', linewidth=1, alpha=0.4)
     ax1.axvline(x=60, color='gray', linestyle='--', linewidth=1, alpha=0.4)
@@ -982,33 +1103,22 @@ def create_risk_charts(analysis_data):
         ax1.text(width + 2, bar.get_y() + bar.get_height()/2, f'{score:.1f}', 
                 ha='left', va='center', fontsize=9, fontweight='bold')
     
-    # Chart 2: Risk Distribution Pie
+    # Chart 2: Risk Distribution
     ax2 = fig.add_subplot(gs[0, 2])
-    risk_counts = {
-        'CRITICAL\n(75-100)': sum(1 for s in scores if s >= 75),
-        'HIGH\n(60-75)': sum(1 for s in scores if 60 <= s < 75),
-        'MODERATE\n(40-60)': sum(1 for s in scores if 40 <= s < 60),
-        'LOW\n(0-40)': sum(1 for s in scores if s < 40)
-    }
-    
-    pie_colors = ['#dc2626', '#ea580c', '#f59e0b', '#10b981']
-    pie_data = [v for v in risk_counts.values() if v > 0]
-    pie_labels = [k for k, v in risk_counts.items() if v > 0]
-    pie_colors_filtered = [c for c, v in zip(pie_colors, risk_counts.values()) if v > 0]
-    
-    ax2.pie(pie_data, labels=pie_labels, colors=pie_colors_filtered,
-            autopct='%1.0f%%', startangle=90,
-            textprops={'fontsize': 9, 'fontweight': 'bold'})
-    ax2.set_title('Risk Level\nDistribution', fontsize=11, fontweight='bold', pad=10)
+    level_counts = np.bincount(levels, minlength=4)
+    plot_category_bars(ax2,
+                       ['LOW\n(0-40)', 'MODERATE\n(40-60)', 'HIGH\n(60-75)', 'CRITICAL\n(75-100)'],
+                       level_counts, RISK_COLORS.tolist())
+    ax2.set_title('Risk Level\nDistribution', pad=10)
     
     # Chart 3: Temperature Distribution
     ax3 = fig.add_subplot(gs[1, 0])
     ax3.hist(df['temp_max'], bins=15, color='#dc2626', edgecolor='black', alpha=0.7, linewidth=1)
     ax3.axvline(x=df['temp_max'].mean(), color='blue', linestyle='--', linewidth=2, 
                label=f'Mean: {df["temp_max"].mean():.1f}°C')
-    ax3.set_xlabel('Temperature (°C)', fontsize=10, fontweight='bold')
-    ax3.set_ylabel('Frequency', fontsize=10, fontweight='bold')
-    ax3.set_title('Temperature Distribution', fontsize=11, fontweight='bold')
+    ax3.set_xlabel('Temperature (°C)')
+    ax3.set_ylabel('Frequency')
+    ax3.set_title('Temperature Distribution')
     ax3.legend(fontsize=8)
     ax3.grid(axis='y', alpha=0.3)
     
@@ -1018,10 +1128,10 @@ def create_risk_charts(analysis_data):
         scatter = ax4.scatter(df['distance_to_coast_km'], df['salinity_max']/1000, 
                              c=df['salinity_max_risk'], cmap='RdYlGn_r', 
                              s=80, edgecolors='black', linewidth=0.8, alpha=0.7)
-        ax4.set_xlabel('Distance to Coast (km)', fontsize=10, fontweight='bold')
-        ax4.set_ylabel('Salinity (×1000 ppm)', fontsize=10, fontweight='bold')
-        ax4.set_title('Salinity vs Coastal Distance', fontsize=11, fontweight='bold')
-        cbar = plt.colorbar(scatter, ax=ax4)
+        ax4.set_xlabel('Distance to Coast (km)')
+        ax4.set_ylabel('Salinity (×1000 ppm)')
+        ax4.set_title('Salinity vs Coastal Distance')
+        cbar = fig.colorbar(scatter, ax=ax4)
         cbar.set_label('Risk', fontsize=9)
         ax4.grid(alpha=0.3)
     
@@ -1033,18 +1143,18 @@ def create_risk_charts(analysis_data):
     ax5.set_yticks(range(4))
     ax5.set_xticklabels(['Temp', 'Humid', 'Wind', 'Solar'], fontsize=9, rotation=45)
     ax5.set_yticklabels(['Temp', 'Humid', 'Wind', 'Solar'], fontsize=9)
-    ax5.set_title('Parameter\nCorrelation', fontsize=11, fontweight='bold')
+    ax5.set_title('Parameter\nCorrelation')
     
     for i in range(4):
         for j in range(4):
             ax5.text(j, i, f'{param_data.iloc[i, j]:.2f}',
                     ha="center", va="center", color="black", fontsize=8, fontweight='bold')
     
-    plt.colorbar(im, ax=ax5, label='Correlation')
+    fig.colorbar(im, ax=ax5, label='Correlation')
     
     # Chart 6: Risk Score Variation Along Line
     ax6 = fig.add_subplot(gs[2, :])
-    x_points = range(len(df))
+    x_points = range(analysis_data['num_points'])
     
     ax6.plot(x_points, df['temp_max_risk'], 'o-', label='Temperature', linewidth=2, markersize=4, color='#dc2626')
     ax6.plot(x_points, df['humidity_max_risk'], 's-', label='Humidity', linewidth=2, markersize=4, color='#3b82f6')
@@ -1055,9 +1165,9 @@ def create_risk_charts(analysis_data):
     ax6.axhline(y=75, color='#dc2626', linestyle='--', linewidth=1, alpha=0.5, label='Critical')
     ax6.axhline(y=60, color='#ea580c', linestyle='--', linewidth=1, alpha=0.5, label='High')
     
-    ax6.set_xlabel('Sample Point Along Transmission Line', fontsize=11, fontweight='bold')
-    ax6.set_ylabel('Risk Score', fontsize=11, fontweight='bold')
-    ax6.set_title('Risk Score Variation Along Transmission Line Route', fontsize=12, fontweight='bold', pad=15)
+    ax6.set_xlabel('Sample Point Along Transmission Line', fontsize=11)
+    ax6.set_ylabel('Risk Score', fontsize=11)
+    ax6.set_title('Risk Score Variation Along Transmission Line Route', fontsize=12, pad=15)
     ax6.set_ylim(0, 100)
     ax6.legend(fontsize=9, loc='upper left', ncol=4, framealpha=0.9)
     ax6.grid(alpha=0.3)
@@ -1066,46 +1176,111 @@ def create_risk_charts(analysis_data):
     ax6.fill_between(x_points, 60, 75, alpha=0.1, color='orange')
     ax6.fill_between(x_points, 75, 100, alpha=0.1, color='red')
     
-    plt.suptitle('Comprehensive Environmental Risk Analysis', fontsize=16, fontweight='bold', y=0.995)
+    fig.suptitle('Comprehensive Environmental Risk Analysis', fontsize=16, fontweight='bold', y=0.995)
     
     return fig
 
+# Display settings of the individual parameter maps
+PARAM_CONFIGS = {
+    'Temperature': {
+        'value_key': 'temp_max',
+        'risk_key': 'temp_max_risk',
+        'unit': '°C',
+        'source': 'IMD',
+        'icon': '🌡️'
+    },
+    'Rainfall': {
+        'value_key': 'rainfall_max',
+        'risk_key': 'rainfall_max_risk',
+        'unit': 'mm',
+        'source': 'IMD',
+        'icon': '🌧️'
+    },
+    'Humidity': {
+        'value_key': 'humidity_max',
+        'risk_key': 'humidity_max_risk',
+        'unit': '%',
+        'source': 'IMD',
+        'icon': '💧'
+    },
+    'Wind Speed': {
+        'value_key': 'wind_max',
+        'risk_key': 'wind_max_risk',
+        'unit': 'km/h',
+        'source': 'IMD',
+        'icon': '💨'
+    },
+    'Solar Radiation': {
+        'value_key': 'solar_max',
+        'risk_key': 'solar_max_risk',
+        'unit': 'kWh/m²/day',
+        'source': 'IMD',
+        'icon': '☀️'
+    },
+    'Salinity': {
+        'value_key': 'salinity_max',
+        'risk_key': 'salinity_max_risk',
+        'unit': 'ppm',
+        'source': 'Coastal Monitoring',
+        'icon': '🌊'
+    },
+    'Pollution (AQI)': {
+        'value_key': 'pollution_aqi',
+        'risk_key': 'pollution_risk',
+        'unit': 'AQI',
+        'source': 'Air Quality Data',
+        'icon': '🏭'
+    },
+    'Seismic Activity': {
+        'value_key': 'seismic_zone',
+        'risk_key': 'seismic_risk',
+        'unit': 'Zone',
+        'source': 'BIS',
+        'icon': '🌍'
+    }
+}
+
+def get_table_column_config(df):
+    """Display-only number formatting for the analysis data table"""
+    return {
+        col: st.column_config.NumberColumn(format="%.4f" if col in ('lat', 'lon') else "%.2f")
+        for col in df.select_dtypes(include='float').columns
+    }
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def analyze_line(coordinates, spacing_km):
+    """Sample a line and summarise its environmental risks - cached per (coordinates, spacing)"""
+    # Convert the vertex list once; sampling and length both reuse the array
+    coordinates = np.asarray(coordinates, dtype=float)
+    
+    # Generate sample points
+    sample_lats, sample_lons = generate_sample_points(coordinates, spacing_km)
+    
+    # Get environmental data for each point as typed columns
+    df = get_environmental_data_for_points(sample_lats, sample_lons)
+    
+    # Calculate summary statistics - one NumPy pass over all risk columns
+    risk_means = df[list(RISK_SUMMARY_COLUMNS.values())].to_numpy().mean(axis=0, dtype=np.float64)
+    
+    return {
+        'dataframe': df,
+        # Serialized once with the analysis rather than on every results rerun
+        'csv_data': df.to_csv(index=False),
+        'num_points': len(df),
+        'corridor_length_km': get_line_length_km(coordinates),
+        **dict(zip(RISK_SUMMARY_COLUMNS, risk_means)),
+        'overall_risk': risk_means.mean()
+    }
+
 # Analysis button
 if st.session_state.transmission_lines:
     if st.button("🔍 Analyze All Transmission Lines", type="primary", use_container_width=True):
         with st.spinner("Analyzing transmission lines..."):
             st.session_state.analysis_results = {}
+            st.session_state.pdf_reports = {}
             
             for line in st.session_state.transmission_lines:
-                # Generate sample points
-                sample_points = generate_sample_points(line['coordinates'], sample_spacing)
-                
-                # Get environmental data for each point
-                line_data = []
-                for point in sample_points:
-                    data = get_environmental_data_for_point(point['lat'], point['lon'])
-                    line_data.append(data)
-                
-                # Calculate summary statistics
-                df = pd.DataFrame(line_data)
-                
-                analysis = {
-                    'line_data': line_data,
-                    'dataframe': df,
-                    'temp_risk': df['temp_max_risk'].mean(),
-                    'rainfall_risk': df['rainfall_max_risk'].mean(),
-                    'humidity_risk': df['humidity_max_risk'].mean(),
-                    'wind_risk': df['wind_max_risk'].mean(),
-                    'solar_risk': df['solar_max_risk'].mean(),
-                    'salinity_risk': df['salinity_max_risk'].mean(),
-                    'pollution_risk': df['pollution_risk'].mean(),
-                    'seismic_risk': df['seismic_risk'].mean(),
-                    'overall_risk': df[['temp_max_risk', 'rainfall_max_risk', 'humidity_max_risk', 
-                                       'wind_max_risk', 'solar_max_risk', 'salinity_max_risk', 
-                                       'pollution_risk', 'seismic_risk']].mean().mean()
-                }
-                
-                st.session_state.analysis_results[line['name']] = analysis
+                st.session_state.analysis_results[line['name']] = analyze_line(line['coordinates'], sample_spacing)
             
             st.session_state.analysis_complete = True
             st.success(f"✅ Analysis complete for {len(st.session_state.transmission_lines)} transmission line(s)!")
@@ -1113,6 +1288,21 @@ if st.session_state.transmission_lines:
 # Display results
 if st.session_state.analysis_complete and st.session_state.analysis_results:
     
+    # Render each analysed line's PDF report once per analysis, report settings and
+    # day - later reruns reuse the stored bytes. Reports carry only the date (no time
+    # of day), so a cached report is never stale. Lines added since the last analysis
+    # have no results yet, so they get no report.
+    report_settings = (client_name, project_code, circle_radius, sample_spacing, datetime.now().date())
+    report_keys = [(line['name'], report_settings) for line in st.session_state.transmission_lines
+                   if line['name'] in st.session_state.analysis_results]
+    cached_reports = st.session_state.pdf_reports
+    st.session_state.pdf_reports = {
+        key: cached_reports[key] if key in cached_reports
+        else generate_professional_pdf(key[0], st.session_state.analysis_results[key[0]], *report_settings)
+        for key in report_keys
+    }
+    pdf_reports = {name: report for (name, _), report in st.session_state.pdf_reports.items()}
+    
     # If multiple lines, use tabs
     if len(st.session_state.analysis_results) > 1:
         tabs = st.tabs([line['name'] for line in st.session_state.transmission_lines])
@@ -1123,22 +1313,10 @@ if st.session_state.analysis_complete and st.session_state.analysis_results:
                 
                 # Overall risk card
                 overall_risk = analysis['overall_risk']
-                if overall_risk >= 75:
-                    risk_class = 'risk-critical'
-                    risk_label = 'CRITICAL RISK'
-                    risk_emoji = '🔴'
-                elif overall_risk >= 60:
-                    risk_class = 'risk-high'
-                    risk_label = 'HIGH RISK'
-                    risk_emoji = '🟠'
-                elif overall_risk >= 40:
-                    risk_class = 'risk-moderate'
-                    risk_label = 'MODERATE RISK'
-                    risk_emoji = '🟡'
-                else:
-                    risk_class = 'risk-low'
-                    risk_label = 'LOW RISK'
-                    risk_emoji = '🟢'
+                overall_level = risk_level_index(overall_risk)
+                risk_class = RISK_CARD_STYLES[overall_level]
+                risk_label = f"{RISK_LEVELS[overall_level]} RISK"
+                risk_emoji = RISK_EMOJIS[overall_level]
                 
                 st.markdown(f"""
                 <div class='metric-card {risk_class}'>
@@ -1152,110 +1330,45 @@ if st.session_state.analysis_complete and st.session_state.analysis_results:
                 st.markdown("### 📊 Risk Analysis Charts")
                 fig = create_risk_charts(analysis)
                 st.pyplot(fig)
-                plt.close()
                 
                 # Parameter maps
                 st.markdown("### 🗺️ Individual Parameter Maps")
                 st.info("💡 Each map shows circle markers with risk-based colors. Expand to view detailed analysis.")
                 
-                param_configs = {
-                    'Temperature': {
-                        'value_key': 'temp_max',
-                        'risk_key': 'temp_max_risk',
-                        'unit': '°C',
-                        'source': 'IMD',
-                        'icon': '🌡️'
-                    },
-                    'Rainfall': {
-                        'value_key': 'rainfall_max',
-                        'risk_key': 'rainfall_max_risk',
-                        'unit': 'mm',
-                        'source': 'IMD',
-                        'icon': '🌧️'
-                    },
-                    'Humidity': {
-                        'value_key': 'humidity_max',
-                        'risk_key': 'humidity_max_risk',
-                        'unit': '%',
-                        'source': 'IMD',
-                        'icon': '💧'
-                    },
-                    'Wind Speed': {
-                        'value_key': 'wind_max',
-                        'risk_key': 'wind_max_risk',
-                        'unit': 'km/h',
-                        'source': 'IMD',
-                        'icon': '💨'
-                    },
-                    'Solar Radiation': {
-                        'value_key': 'solar_max',
-                        'risk_key': 'solar_max_risk',
-                        'unit': 'kWh/m²/day',
-                        'source': 'IMD',
-                        'icon': '☀️'
-                    },
-                    'Salinity': {
-                        'value_key': 'salinity_max',
-                        'risk_key': 'salinity_max_risk',
-                        'unit': 'ppm',
-                        'source': 'Coastal Monitoring',
-                        'icon': '🌊'
-                    },
-                    'Pollution (AQI)': {
-                        'value_key': 'pollution_aqi',
-                        'risk_key': 'pollution_risk',
-                        'unit': 'AQI',
-                        'source': 'Air Quality Data',
-                        'icon': '🏭'
-                    },
-                    'Seismic Activity': {
-                        'value_key': 'seismic_zone',
-                        'risk_key': 'seismic_risk',
-                        'unit': 'Zone',
-                        'source': 'BIS',
-                        'icon': '🌍'
-                    }
-                }
-                
-                for param_name, config in param_configs.items():
+                for param_name, config in PARAM_CONFIGS.items():
                     risk_score = analysis[config['risk_key'].replace('_max_risk', '_risk')]
                     
                     with st.expander(f"{config['icon']} {param_name} - Risk: {risk_score:.1f}/100"):
-                        param_map = create_parameter_map(analysis['line_data'], param_name, config)
-                        st_folium(param_map, width=None, height=400, key=f"{line['name']}_{param_name}_map")
+                        components.html(render_parameter_map_html(analysis['dataframe'], param_name, config), height=400)
                 
                 # Data table
                 st.markdown("### 📋 Detailed Analysis Data")
-                st.dataframe(analysis['dataframe'], use_container_width=True)
+                st.dataframe(analysis['dataframe'], use_container_width=True,
+                             column_config=get_table_column_config(analysis['dataframe']))
                 
                 # Download buttons
                 st.markdown("### 📥 Download Reports")
                 col_csv, col_pdf = st.columns(2)
                 
                 with col_csv:
-                    csv = analysis['dataframe'].to_csv(index=False)
                     st.download_button(
                         label=f"📊 CSV Data",
-                        data=csv,
+                        data=analysis['csv_data'],
                         file_name=f"{line['name']}_analysis.csv",
                         mime="text/csv",
                         use_container_width=True
                     )
                 
                 with col_pdf:
-                    pdf_path, pdf_filename = generate_professional_pdf(
-                        line['name'], analysis, client_name, project_code,
-                        circle_radius, sample_spacing
-                    )
+                    pdf_bytes, pdf_filename = pdf_reports[line['name']]
                     
-                    with open(pdf_path, "rb") as pdf_file:
-                        st.download_button(
-                            label=f"📘 PDF Report",
-                            data=pdf_file,
-                            file_name=pdf_filename,
-                            mime="application/pdf",
-                            use_container_width=True
-                        )
+                    st.download_button(
+                        label=f"📘 PDF Report",
+                        data=pdf_bytes,
+                        file_name=pdf_filename,
+                        mime="application/pdf",
+                        use_container_width=True
+                    )
     
     else:
         # Single line - no tabs needed
@@ -1264,22 +1377,10 @@ if st.session_state.analysis_complete and st.session_state.analysis_results:
         
         # Overall risk card
         overall_risk = analysis['overall_risk']
-        if overall_risk >= 75:
-            risk_class = 'risk-critical'
-            risk_label = 'CRITICAL RISK'
-            risk_emoji = '🔴'
-        elif overall_risk >= 60:
-            risk_class = 'risk-high'
-            risk_label = 'HIGH RISK'
-            risk_emoji = '🟠'
-        elif overall_risk >= 40:
-            risk_class = 'risk-moderate'
-            risk_label = 'MODERATE RISK'
-            risk_emoji = '🟡'
-        else:
-            risk_class = 'risk-low'
-            risk_label = 'LOW RISK'
-            risk_emoji = '🟢'
+        overall_level = risk_level_index(overall_risk)
+        risk_class = RISK_CARD_STYLES[overall_level]
+        risk_label = f"{RISK_LEVELS[overall_level]} RISK"
+        risk_emoji = RISK_EMOJIS[overall_level]
         
         st.markdown(f"""
         <div class='metric-card {risk_class}'>
@@ -1293,110 +1394,45 @@ if st.session_state.analysis_complete and st.session_state.analysis_results:
         st.markdown("### 📊 Risk Analysis Charts")
         fig = create_risk_charts(analysis)
         st.pyplot(fig)
-        plt.close()
         
         # Parameter maps
         st.markdown("### 🗺️ Individual Parameter Maps")
         st.info("💡 Each map shows circle markers with risk-based colors. Expand to view detailed analysis.")
         
-        param_configs = {
-            'Temperature': {
-                'value_key': 'temp_max',
-                'risk_key': 'temp_max_risk',
-                'unit': '°C',
-                'source': 'IMD',
-                'icon': '🌡️'
-            },
-            'Rainfall': {
-                'value_key': 'rainfall_max',
-                'risk_key': 'rainfall_max_risk',
-                'unit': 'mm',
-                'source': 'IMD',
-                'icon': '🌧️'
-            },
-            'Humidity': {
-                'value_key': 'humidity_max',
-                'risk_key': 'humidity_max_risk',
-                'unit': '%',
-                'source': 'IMD',
-                'icon': '💧'
-            },
-            'Wind Speed': {
-                'value_key': 'wind_max',
-                'risk_key': 'wind_max_risk',
-                'unit': 'km/h',
-                'source': 'IMD',
-                'icon': '💨'
-            },
-            'Solar Radiation': {
-                'value_key': 'solar_max',
-                'risk_key': 'solar_max_risk',
-                'unit': 'kWh/m²/day',
-                'source': 'IMD',
-                'icon': '☀️'
-            },
-            'Salinity': {
-                'value_key': 'salinity_max',
-                'risk_key': 'salinity_max_risk',
-                'unit': 'ppm',
-                'source': 'Coastal Monitoring',
-                'icon': '🌊'
-            },
-            'Pollution (AQI)': {
-                'value_key': 'pollution_aqi',
-                'risk_key': 'pollution_risk',
-                'unit': 'AQI',
-                'source': 'Air Quality Data',
-                'icon': '🏭'
-            },
-            'Seismic Activity': {
-                'value_key': 'seismic_zone',
-                'risk_key': 'seismic_risk',
-                'unit': 'Zone',
-                'source': 'BIS',
-                'icon': '🌍'
-            }
-        }
-        
-        for param_name, config in param_configs.items():
+        for param_name, config in PARAM_CONFIGS.items():
             risk_score = analysis[config['risk_key'].replace('_max_risk', '_risk')]
             
             with st.expander(f"{config['icon']} {param_name} - Risk: {risk_score:.1f}/100"):
-                param_map = create_parameter_map(analysis['line_data'], param_name, config)
-                st_folium(param_map, width=None, height=400, key=f"{param_name}_map")
+                components.html(render_parameter_map_html(analysis['dataframe'], param_name, config), height=400)
         
         # Data table
         st.markdown("### 📋 Detailed Analysis Data")
-        st.dataframe(analysis['dataframe'], use_container_width=True)
+        st.dataframe(analysis['dataframe'], use_container_width=True,
+                     column_config=get_table_column_config(analysis['dataframe']))
         
         # Download buttons
         st.markdown("### 📥 Download Reports")
         col_csv, col_pdf = st.columns(2)
         
         with col_csv:
-            csv = analysis['dataframe'].to_csv(index=False)
             st.download_button(
                 label="📊 CSV Data",
-                data=csv,
+                data=analysis['csv_data'],
                 file_name="transmission_line_analysis.csv",
                 mime="text/csv",
                 use_container_width=True
             )
         
         with col_pdf:
-            pdf_path, pdf_filename = generate_professional_pdf(
-                line['name'], analysis, client_name, project_code,
-                circle_radius, sample_spacing
-            )
+            pdf_bytes, pdf_filename = pdf_reports[line['name']]
             
-            with open(pdf_path, "rb") as pdf_file:
-                st.download_button(
-                    label="📘 Professional PDF Report",
-                    data=pdf_file,
-                    file_name=pdf_filename,
-                    mime="application/pdf",
-                    use_container_width=True
-                )
+            st.download_button(
+                label="📘 Professional PDF Report",
+                data=pdf_bytes,
+                file_name=pdf_filename,
+                mime="application/pdf",
+                use_container_width=True
+            )
 
 # Footer
 st.markdown("---")